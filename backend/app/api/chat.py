@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Query, Request, Response, HTTPException
 from app.rag.chroma_setup import collection
 from app.rag.embeddings import get_embedding
 from app.tools.moderation import is_prompt_flagged
@@ -10,6 +10,14 @@ from app.db.db import (
     cache_lookup_fuzzy,
     cache_upsert,
 )
+from app.db.feedback_buffer import settle_vote
+from app.db.validators import (
+    CACHE_CONTROL,
+    make_etag,
+    etag_matches,
+    remember_validator,
+    lookup_validator,
+)
 
 import os
 import re
@@ -93,6 +101,95 @@ def extract_author(q: str) -> str | None:
 def norm(s: str) -> str:
     return unidecode((s or "").strip().lower())
 
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def _not_cached() -> HTTPException:
+    return HTTPException(status_code=404, detail="Not cached",
+                         headers={"Cache-Control": "no-store"})
+
+def _cache_key(query: str, prompt_norm: str) -> str:
+    return "[img] " + prompt_norm if wants_image(query) else prompt_norm
+
+async def _cached_answer(query: str, prompt_norm: str) -> tuple[dict, str] | None:
+    """
+    Serve from qa_cache (image exact, else text exact then fuzzy).
+    Returns (response body, prompt_norm of the qa_cache row it came from).
+    """
+    key = _cache_key(query, prompt_norm)
+    await settle_vote(key)
+    hit = await cache_lookup_exact(key)
+
+    if key != prompt_norm:
+        if not hit:
+            return None
+        return {
+            "image_url": hit["output_data"],
+            "prompt_norm": key,
+            "from_cache": True,
+            "model_name": hit["model_name"],
+            "generation_cost_usd": float(hit["generation_cost_usd"]),
+            "generated_at": hit["generated_at"]
+        }, key
+
+    if hit:
+        return {
+            "recommended_title": None,
+            "explanation": hit["output_data"],
+            "source_summary": None,
+            "from_cache": True,
+            "model_name": hit["model_name"],
+            "generation_cost_usd": float(hit["generation_cost_usd"]),
+            "generated_at": hit["generated_at"],
+            "prompt_norm": prompt_norm,               # <-- include
+        }, prompt_norm
+
+    near = await cache_lookup_fuzzy(prompt_norm, threshold=FUZZY_THRESHOLD)
+    if near:
+        return {
+            "recommended_title": None,
+            "explanation": near["output_data"],
+            "source_summary": None,
+            "from_cache": True,
+            "model_name": near["model_name"],
+            "generation_cost_usd": float(near["generation_cost_usd"]),
+            "generated_at": near["generated_at"],
+            "prompt_norm": prompt_norm,
+        }, near["source_prompt_norm"]
+    return None
+
+@router.get("/cached")
+async def get_cached_recommendation(request: Request, response: Response,
+                                    q: str = Query(...)):
+    """
+    Cache-served answers as a GET resource, so the browser's HTTP cache can
+    revalidate them with If-None-Match. 404 means "not cached, POST /chat/".
+    """
+    if len(q.strip()) < 3:
+        raise _not_cached()
+    prompt_norm = normalize_prompt(q)
+    key = _cache_key(q, prompt_norm)
+
+    # L1: answer the conditional request without a qa_cache round trip
+    if_none_match = request.headers.get("if-none-match")
+    etag = lookup_validator(key) if if_none_match else None
+    if etag and etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    cached = await _cached_answer(q, prompt_norm)
+    # Flagged prompts fall through to POST, which answers with the refusal
+    if not cached or is_prompt_flagged(q):
+        raise _not_cached()
+
+    body, source_prompt_norm = cached
+    etag = make_etag(source_prompt_norm, body["generated_at"])
+    remember_validator(key, source_prompt_norm, etag)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return body
+
 @router.post("/")
 async def get_book_recommendation(query: str = Body(..., embed=True)):
     if not query or len(query.strip()) < 3:
@@ -113,16 +210,9 @@ async def get_book_recommendation(query: str = Body(..., embed=True)):
         img_prompt_norm = "[img] " + prompt_norm
 
         # Check cache for image first
-        hit = await cache_lookup_exact(img_prompt_norm)
-        if hit:
-            return {
-                "image_url": hit["output_data"],
-                "prompt_norm": img_prompt_norm,
-                "from_cache": True,
-                "model_name": hit["model_name"],
-                "generation_cost_usd": float(hit["generation_cost_usd"]),
-                "generated_at": hit["generated_at"]
-            }
+        cached = await _cached_answer(query, prompt_norm)
+        if cached:
+            return cached[0]
 
         print("🖼 Image generation requested")
         try:
@@ -155,7 +245,7 @@ async def get_book_recommendation(query: str = Body(..., embed=True)):
         generation_cost_usd = 0.02  # adjust if you have exact pricing
 
         # Save image to cache
-        await cache_upsert(
+        generated_at = await cache_upsert(
             img_prompt_norm,
             output_format="image",
             output_data=image_url,
@@ -168,37 +258,15 @@ async def get_book_recommendation(query: str = Body(..., embed=True)):
             "prompt_norm": img_prompt_norm,
             "from_cache": False,
             "model_name": "gpt-image-1",
-            "generation_cost_usd": generation_cost_usd
+            "generation_cost_usd": generation_cost_usd,
+            "generated_at": generated_at,
         }
 
 
     # ---------- CACHE: exact then fuzzy ----------
-    hit = await cache_lookup_exact(prompt_norm)
-    if hit:
-        return {
-            "recommended_title": None,
-            "explanation": hit["output_data"],
-            "source_summary": None,
-            "from_cache": True,
-            "model_name": hit["model_name"],
-            "generation_cost_usd": float(hit["generation_cost_usd"]),
-            "generated_at": hit["generated_at"],
-            "prompt_norm": prompt_norm,               # <-- include
-        }
-
-    near = await cache_lookup_fuzzy(prompt_norm, threshold=FUZZY_THRESHOLD)
-    if near:
-        near["generation_cost_usd"] = float(near["generation_cost_usd"])
-        return {
-            "recommended_title": None,
-            "explanation": near["output_data"],
-            "source_summary": None,
-            "from_cache": True,
-            "model_name": near["model_name"],
-            "generation_cost_usd": near["generation_cost_usd"],
-            "generated_at": near["generated_at"],
-            "prompt_norm": prompt_norm,              
-        }
+    cached = await _cached_answer(query, prompt_norm)
+    if cached:
+        return cached[0]
 
     # ---------- RAG: retrieve ----------
     print(f"🔍 Query: {query}")
@@ -293,7 +361,7 @@ Răspunsul trebuie să fie de maxim 50 de cuvinte.
     print(f"💰 Tokens in/out: {prompt_tokens}/{completion_tokens} -> cost ${generation_cost_usd:.6f}")
 
     # ---------- Persist to cache ----------
-    await cache_upsert(
+    generated_at = await cache_upsert(
         prompt_norm,
         output_format="text",
         output_data=gpt_reply,
@@ -310,5 +378,6 @@ Răspunsul trebuie să fie de maxim 50 de cuvinte.
         "from_cache": False,
         "model_name": model_name,
         "generation_cost_usd": generation_cost_usd,
+        "generated_at": generated_at,
         "prompt_norm": prompt_norm,                   # <-- include for frontend thumbs
     }
@@ -1,37 +1,30 @@
 # app/api/feedback.py
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter
 from pydantic import BaseModel
-from typing import Literal
-from app.db.db import get_pool
+from typing import Literal, Optional
+from datetime import datetime
+from app.db.db import normalize_prompt
+from app.db.feedback_buffer import enqueue_vote, stats
 
 router = APIRouter()
 
 class FeedbackPayload(BaseModel):
     prompt_norm: str
     thumb: Literal["up", "down"]
+    generated_at: Optional[datetime] = None   # version of the answer being rated
 
-@router.post("/")
+@router.post("/", status_code=202)
 async def submit_feedback(payload: FeedbackPayload):
-    pool = await get_pool()
-    async with pool.acquire() as con:
-        if payload.thumb == "up":
-            updated = await con.execute(
-                """
-                UPDATE qa_cache
-                   SET liked = TRUE
-                 WHERE input_prompt_normalized = $1
-                """,
-                payload.prompt_norm.lower().strip()
-            )
-            return {"status": "ok", "action": "liked", "rows": updated}
-        else:
-            # Strategy A: TTL from generation time (preferred, keeps semantics clean)
-            updated = await con.execute(
-                """
-                UPDATE qa_cache
-                   SET liked = FALSE
-                 WHERE input_prompt_normalized = $1
-                """,
-                payload.prompt_norm.lower().strip()
-            )
-            return {"status": "ok", "action": "disliked", "rows": updated}
+    # Buffered write-behind: the vote is applied by the next batched flush
+    liked = payload.thumb == "up"
+    pending = await enqueue_vote(payload.prompt_norm, liked, payload.generated_at)
+    return {
+        "status": "accepted",
+        "action": "liked" if liked else "disliked",
+        "prompt_norm": normalize_prompt(payload.prompt_norm),
+        "pending": pending,
+    }
+
+@router.get("/stats")
+async def feedback_stats():
+    return stats()
@@ -1,8 +1,11 @@
 import os, asyncio, re
+from datetime import datetime
 from typing import Optional, Tuple, Dict, Any
 import asyncpg
 from dotenv import load_dotenv
 
+from app.db.validators import invalidate_validator
+
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -81,6 +84,7 @@ async def cache_lookup_fuzzy(prompt_norm: str, threshold: float = 0.50) -> Optio
                 row["input_prompt_normalized"],
             )
             return {
+                "source_prompt_norm": row["input_prompt_normalized"],
                 "output_format": row["output_format"],
                 "output_data": row["output_data"],
                 "model_name": row["model_name"],
@@ -90,10 +94,10 @@ async def cache_lookup_fuzzy(prompt_norm: str, threshold: float = 0.50) -> Optio
         return None
 
 async def cache_upsert(prompt_norm: str, *, output_format: str, output_data: str,
-                       model_name: str, generation_cost_usd: float):
+                       model_name: str, generation_cost_usd: float) -> datetime:
     pool = await get_pool()
     async with pool.acquire() as con:
-        await con.execute(
+        generated_at = await con.fetchval(
             """
             INSERT INTO qa_cache (
               input_prompt_normalized, output_format, output_data,
@@ -108,6 +112,39 @@ async def cache_upsert(prompt_norm: str, *, output_format: str, output_data: str
                 generated_at  = EXCLUDED.generated_at,
                 liked         = NULL,                 -- reset on regeneration
                 last_accessed_at = now()
+            RETURNING generated_at
             """,
             prompt_norm, output_format, output_data, model_name, generation_cost_usd
         )
+    invalidate_validator(prompt_norm)
+    return generated_at
+
+async def cache_set_liked_batch(votes: Dict[str, Tuple[bool, Optional[datetime]]]) -> Tuple[int, int]:
+    """
+    Apply many like/dislike votes in a single set-based UPDATE.
+    Each vote is (liked, generated_at of the answer the user saw); a row
+    regenerated since then is left alone. A None generated_at matches any version.
+    Returns (applied, unmatched) where unmatched prompts had no qa_cache row
+    or only a different answer than the one voted on.
+    """
+    if not votes:
+        return 0, 0
+    prompts = list(votes.keys())
+    liked = [votes[p][0] for p in prompts]
+    generated_at = [votes[p][1] for p in prompts]
+    pool = await get_pool()
+    async with pool.acquire() as con:
+        rows = await con.fetch(
+            """
+            UPDATE qa_cache AS q
+               SET liked = v.liked
+              FROM unnest($1::text[], $2::bool[], $3::timestamptz[])
+                   AS v(prompt_norm, liked, generated_at)
+             WHERE q.input_prompt_normalized = v.prompt_norm
+               AND (v.generated_at IS NULL OR q.generated_at = v.generated_at)
+            RETURNING q.input_prompt_normalized
+            """,
+            prompts, liked, generated_at,
+        )
+    applied = len(rows)
+    return applied, len(prompts) - applied
@@ -0,0 +1,117 @@
+# backend/app/db/feedback_buffer.py
+import os, asyncio
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Tuple
+
+from app.db.db import normalize_prompt, cache_set_liked_batch
+from app.db.validators import invalidate_validator
+
+FLUSH_INTERVAL_S = float(os.getenv("FEEDBACK_FLUSH_INTERVAL_S", "2.0"))
+FLUSH_MAX_PENDING = int(os.getenv("FEEDBACK_FLUSH_MAX_PENDING", "100"))
+
+# -------- Write-behind buffer -------------------------------------------------
+# Votes are keyed by the canonical prompt, so repeated clicks on the same
+# answer coalesce to the latest thumb and cost a single row in the next flush.
+# Each vote carries the generated_at of the answer it rates, so it never lands
+# on a regenerated one.
+_pending: Dict[str, Tuple[bool, Optional[datetime]]] = {}
+_lock = asyncio.Lock()
+_flusher: Optional[asyncio.Task] = None
+_wake = asyncio.Event()  # set when the size threshold is hit; one flusher serves it
+_stopping = asyncio.Event()
+_last_flush: Dict[str, Any] = {"applied": 0, "unmatched": 0, "flushed_at": None}
+_totals: Dict[str, int] = {"applied": 0, "unmatched": 0, "failed_flushes": 0}
+
+def pending_count() -> int:
+    return len(_pending)
+
+def stats() -> Dict[str, Any]:
+    return {"pending": len(_pending), "last_flush": dict(_last_flush), "totals": dict(_totals)}
+
+async def enqueue_vote(prompt_norm: str, liked: bool,
+                       generated_at: Optional[datetime] = None) -> int:
+    prompt_norm = normalize_prompt(prompt_norm)
+    _pending[prompt_norm] = (liked, generated_at)
+    if not liked:
+        # A disliked row stops being cache-servable; never answer 304 for it again
+        invalidate_validator(prompt_norm)
+    if len(_pending) >= FLUSH_MAX_PENDING:
+        _wake.set()
+    return len(_pending)
+
+async def settle_vote(prompt_norm: str):
+    """
+    Flush now if this prompt has a queued vote, so a quick re-ask sees it:
+    a thumbs-up is served from the cache instead of paying for a fresh
+    generation, a thumbs-down stops the rejected answer being served again.
+    """
+    if normalize_prompt(prompt_norm) in _pending:
+        await _flush_quietly()
+
+async def flush() -> Dict[str, int]:
+    global _pending
+    async with _lock:
+        if not _pending:
+            return {"applied": 0, "unmatched": 0}
+        batch, _pending = _pending, {}
+        try:
+            applied, unmatched = await cache_set_liked_batch(batch)
+        except BaseException as e:
+            # Put the batch back (also on cancellation, e.g. a dropped request
+            # in settle_vote); votes that arrived meanwhile are newer and win.
+            _pending = {**batch, **_pending}
+            _totals["failed_flushes"] += 1
+            print(f"⚠️ Feedback flush failed ({len(batch)} votes re-queued): {e!r}")
+            raise
+
+    # Re-validations between enqueue and flush may have re-learned these
+    for prompt_norm, (liked, _) in batch.items():
+        if not liked:
+            invalidate_validator(prompt_norm)
+    _last_flush.update(applied=applied, unmatched=unmatched,
+                       flushed_at=datetime.now(timezone.utc).isoformat())
+    _totals["applied"] += applied
+    _totals["unmatched"] += unmatched
+    print(f"[FEEDBACK FLUSH] applied={applied} unmatched={unmatched}")
+    return {"applied": applied, "unmatched": unmatched}
+
+async def _flush_quietly() -> bool:
+    try:
+        await flush()
+        return True
+    except Exception:
+        return False  # already logged; batch stays queued for the next tick
+
+async def _wait(event: asyncio.Event, timeout: float):
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+async def _flush_loop():
+    while not _stopping.is_set():
+        await _wait(_wake, FLUSH_INTERVAL_S)
+        _wake.clear()
+        if _stopping.is_set():
+            break  # stop_flusher() does the final drain
+        if not await _flush_quietly():
+            # DB is down: back off a full interval instead of retrying per vote
+            await _wait(_stopping, FLUSH_INTERVAL_S)
+
+def start_flusher():
+    global _flusher
+    if _flusher is None:
+        _stopping.clear()
+        _flusher = asyncio.create_task(_flush_loop())
+
+async def stop_flusher():
+    global _flusher
+    if _flusher is not None:
+        # Let an in-flight flush finish instead of cancelling it mid-write
+        _stopping.set()
+        _wake.set()
+        await _flusher
+        _flusher = None
+    # Drain whatever is left before the pool goes away
+    if not await _flush_quietly():
+        print(f"⚠️ Feedback lost on shutdown: {len(_pending)} votes not applied")
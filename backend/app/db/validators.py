@@ -0,0 +1,61 @@
+# backend/app/db/validators.py
+import os, time, hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+VALIDATOR_L1_SIZE = int(os.getenv("VALIDATOR_L1_SIZE", "2048"))
+# How long L1 may answer 304 without asking the DB. Invalidations only reach
+# this process, so this bounds staleness after a change made by another worker.
+VALIDATOR_L1_TTL_S = float(os.getenv("VALIDATOR_L1_TTL_S", "30"))
+CACHE_CONTROL = "private, no-cache"
+
+# -------- ETag derivation -----------------------------------------------------
+def make_etag(source_prompt_norm: str, generated_at: datetime) -> str:
+    """
+    Deterministic validator for a cache-served answer: the qa_cache row it
+    came from (prompt_norm) plus the moment that row was (re)generated.
+    Weak, because GZipMiddleware may serve the same answer under different
+    content-codings and a strong ETag must differ between those.
+    """
+    raw = f"{source_prompt_norm}|{generated_at.isoformat()}".encode("utf-8")
+    return 'W/"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return "*" in candidates or _opaque(etag) in {_opaque(t) for t in candidates}
+
+# -------- L1 validator state (per process) ------------------------------------
+# request prompt_norm -> (etag, source prompt_norm of the qa_cache row served,
+# monotonic expiry). Fuzzy hits map a request prompt onto another row, hence
+# the source column.
+_l1: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+
+def remember_validator(prompt_norm: str, source_prompt_norm: str, etag: str):
+    _l1[prompt_norm] = (etag, source_prompt_norm, time.monotonic() + VALIDATOR_L1_TTL_S)
+    _l1.move_to_end(prompt_norm)
+    while len(_l1) > VALIDATOR_L1_SIZE:
+        _l1.popitem(last=False)
+
+def lookup_validator(prompt_norm: str) -> Optional[str]:
+    entry = _l1.get(prompt_norm)
+    if entry is None:
+        return None
+    if entry[2] <= time.monotonic():
+        del _l1[prompt_norm]
+        return None
+    _l1.move_to_end(prompt_norm)
+    return entry[0]
+
+def invalidate_validator(source_prompt_norm: str):
+    """Drop every validator backed by, or keyed on, this qa_cache row."""
+    stale = [k for k, (_, src, _) in _l1.items()
+             if src == source_prompt_norm or k == source_prompt_norm]
+    for k in stale:
+        del _l1[k]
@@ -1,11 +1,13 @@
 # backend/app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from starlette.concurrency import run_in_threadpool
 
 from app.api.chat import router as chat_router
 from app.rag.chroma_setup import load_books_to_chroma
 from app.db.db import get_pool, close_pool 
+from app.db.feedback_buffer import start_flusher, stop_flusher
 from app.api import feedback
 
 app = FastAPI(title="Smart Librarian RAG")
@@ -18,8 +20,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # let the client read validators for If-None-Match
 )
 
+# Compress large JSON payloads (explanations, base64 image data URLs)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Startup: warm the DB pool and load your RAG store
 @app.on_event("startup")
 async def startup():
@@ -29,9 +35,13 @@ async def startup():
     # 2) Load embeddings / collection (runs sync; push to thread to avoid blocking loop)
     await run_in_threadpool(load_books_to_chroma, "app/data/book_summaries.json")
 
-# Shutdown: close DB pool
+    # 3) Start the write-behind feedback flusher
+    start_flusher()
+
+# Shutdown: drain buffered feedback, then close DB pool
 @app.on_event("shutdown")
 async def shutdown():
+    await stop_flusher()
     await close_pool()
 
 # Routes
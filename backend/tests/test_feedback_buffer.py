@@ -0,0 +1,151 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+import app.db.feedback_buffer as fb
+
+
+@pytest.fixture(autouse=True)
+def fresh_buffer(monkeypatch):
+    # Module state is process-global; give every test its own, bound to its own loop
+    monkeypatch.setattr(fb, "_pending", {})
+    monkeypatch.setattr(fb, "_lock", asyncio.Lock())
+    monkeypatch.setattr(fb, "_wake", asyncio.Event())
+    monkeypatch.setattr(fb, "_stopping", asyncio.Event())
+    monkeypatch.setattr(fb, "_flusher", None)
+    monkeypatch.setattr(fb, "_last_flush", {"applied": 0, "unmatched": 0, "flushed_at": None})
+    monkeypatch.setattr(fb, "_totals", {"applied": 0, "unmatched": 0, "failed_flushes": 0})
+    monkeypatch.setattr(fb, "FLUSH_INTERVAL_S", 60.0)
+
+
+def stub_batch(monkeypatch, result=None, delay=0.0, error=None, calls=None):
+    async def fake(batch):
+        if calls is not None:
+            calls.append(dict(batch))
+        if delay:
+            await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result if result is not None else (len(batch), 0)
+    monkeypatch.setattr(fb, "cache_set_liked_batch", fake)
+
+
+def test_votes_coalesce_on_canonical_prompt(monkeypatch):
+    calls = []
+    stub_batch(monkeypatch, calls=calls)
+    ts = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    async def run():
+        await fb.enqueue_vote("  Carti   despre MARE ", True)
+        await fb.enqueue_vote("carti despre mare", False, ts)
+        return await fb.flush()
+
+    assert asyncio.run(run()) == {"applied": 1, "unmatched": 0}
+    assert calls == [{"carti despre mare": (False, ts)}]
+    assert fb.pending_count() == 0
+
+
+def test_flush_reports_applied_and_unmatched(monkeypatch):
+    stub_batch(monkeypatch, result=(2, 1))
+
+    async def run():
+        for p in ("a", "b", "c"):
+            await fb.enqueue_vote(p, True)
+        return await fb.flush()
+
+    assert asyncio.run(run()) == {"applied": 2, "unmatched": 1}
+    stats = fb.stats()
+    assert stats["last_flush"]["applied"] == 2
+    assert stats["last_flush"]["unmatched"] == 1
+    assert stats["totals"] == {"applied": 2, "unmatched": 1, "failed_flushes": 0}
+
+
+def test_failed_flush_requeues_and_newer_votes_win(monkeypatch):
+    async def fake(batch):
+        await fb.enqueue_vote("a", False)  # arrives while the batch is in flight
+        raise ConnectionError("db down")
+    monkeypatch.setattr(fb, "cache_set_liked_batch", fake)
+
+    async def run():
+        await fb.enqueue_vote("a", True)
+        await fb.enqueue_vote("b", True)
+        with pytest.raises(ConnectionError):
+            await fb.flush()
+
+    asyncio.run(run())
+    assert fb._pending == {"a": (False, None), "b": (True, None)}
+    assert fb.stats()["totals"]["failed_flushes"] == 1
+
+
+def test_cancelled_flush_requeues(monkeypatch):
+    stub_batch(monkeypatch, delay=1.0)
+
+    async def run():
+        await fb.enqueue_vote("a", True)
+        task = asyncio.create_task(fb.flush())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert fb._pending == {"a": (True, None)}
+
+
+def test_threshold_wakes_flusher(monkeypatch):
+    calls = []
+    stub_batch(monkeypatch, calls=calls)
+    monkeypatch.setattr(fb, "FLUSH_MAX_PENDING", 2)
+
+    async def run():
+        fb.start_flusher()
+        await fb.enqueue_vote("a", True)
+        await asyncio.sleep(0.05)
+        assert calls == []  # below threshold, interval is long
+        await fb.enqueue_vote("b", True)
+        await asyncio.sleep(0.05)
+        await fb.stop_flusher()
+
+    asyncio.run(run())
+    assert calls == [{"a": (True, None), "b": (True, None)}]
+
+
+def test_shutdown_waits_for_inflight_flush(monkeypatch):
+    stub_batch(monkeypatch, delay=0.2)
+    monkeypatch.setattr(fb, "FLUSH_INTERVAL_S", 0.01)
+
+    async def run():
+        fb.start_flusher()
+        await fb.enqueue_vote("a", True)
+        await asyncio.sleep(0.05)  # loop is now mid-flush
+        await fb.stop_flusher()
+
+    asyncio.run(run())
+    assert fb._pending == {}
+    assert fb.stats()["totals"]["applied"] == 1
+
+
+def test_shutdown_drain_survives_db_errors(monkeypatch, capsys):
+    stub_batch(monkeypatch, error=ConnectionError("db down"))
+
+    async def run():
+        fb.start_flusher()
+        await fb.enqueue_vote("a", True)
+        await fb.stop_flusher()  # must not raise, so close_pool() still runs
+
+    asyncio.run(run())
+    assert "Feedback lost on shutdown: 1 votes" in capsys.readouterr().out
+
+
+def test_settle_vote_flushes_any_queued_vote(monkeypatch):
+    calls = []
+    stub_batch(monkeypatch, calls=calls)
+
+    async def run():
+        await fb.settle_vote("a")  # nothing queued: no DB round trip
+        await fb.enqueue_vote("a", False)
+        await fb.settle_vote("A")
+
+    asyncio.run(run())
+    assert calls == [{"a": (False, None)}]
@@ -6,6 +6,7 @@ interface Message {
     sender: "user" | "assistant";
     content: string;
     promptNorm?: string;
+    generatedAt?: string;            // answer version the thumbs refer to
     isImage?: boolean;               // <-- NEW
 }
 
@@ -22,6 +23,7 @@ const ChatHistory: React.FC<ChatHistoryProps> = ({ messages }) => {
                     sender={msg.sender}
                     content={msg.content}
                     promptNorm={msg.promptNorm}
+                    generatedAt={msg.generatedAt}
                     isImage={msg.isImage}
                 />
             ))}
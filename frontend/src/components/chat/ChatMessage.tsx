@@ -9,10 +9,11 @@ interface ChatMessageProps {
     sender: MessageType;
     content: string;         // can be text or image URL
     promptNorm?: string;     // for feedback
+    generatedAt?: string;    // answer version, so the vote can't land on a regenerated one
     isImage?: boolean;       // <-- NEW: flag from parent
 }
 
-const ChatMessage: React.FC<ChatMessageProps> = ({ sender, content, promptNorm, isImage = false }) => {
+const ChatMessage: React.FC<ChatMessageProps> = ({ sender, content, promptNorm, generatedAt, isImage = false }) => {
     const isUser = sender === "user";
 
     const [sending, setSending] = useState(false);
@@ -25,7 +26,7 @@ const ChatMessage: React.FC<ChatMessageProps> = ({ sender, content, promptNorm,
         setSending(true);
         setThumb(vote);
         try {
-            await postFeedback(promptNorm, vote);
+            await postFeedback(promptNorm, vote, generatedAt);
         } catch (err) {
             console.error(err);
             setThumb(null);
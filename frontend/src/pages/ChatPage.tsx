@@ -9,6 +9,7 @@ interface Message {
     sender: "user" | "assistant";
     content: string;
     promptNorm?: string;
+    generatedAt?: string;            // answer version the thumbs refer to
     isImage?: boolean;               // <-- NEW
 }
 
@@ -31,6 +32,7 @@ const ChatPage: React.FC = () => {
                     sender: "assistant",
                     content,
                     promptNorm,
+                    generatedAt: response.generated_at,
                     isImage,                 // <-- carry to history/message
                 },
             ]);
@@ -13,6 +13,7 @@ export interface ChatResponse {
     model_name?: string;
     generation_cost_usd?: number;
     image_url?: string;             // <-- NEW: backend returns this for image responses
+    generated_at?: string;          // version of the cached answer; echoed back with feedback
 }
 
 export type Thumb = "up" | "down";
@@ -20,7 +21,23 @@ export type Thumb = "up" | "down";
 export const normalizePrompt = (s: string) =>
     s.trim().toLowerCase().replace(/\s+/g, " ");
 
+// Cached answers live on a GET resource: the browser's HTTP cache stores them
+// and revalidates with If-None-Match, so repeat questions cost a 304.
+async function fetchCached(message: string): Promise<ChatResponse | null> {
+    try {
+        const response = await fetch(
+            `http://localhost:8000/chat/cached?q=${encodeURIComponent(message)}`
+        );
+        return response.ok ? response.json() : null;
+    } catch {
+        return null;
+    }
+}
+
 export async function sendChatMessage(message: string): Promise<ChatResponse> {
+    const cached = await fetchCached(message);
+    if (cached) return cached;
+
     const response = await fetch("http://localhost:8000/chat/", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
@@ -33,11 +50,11 @@ export async function sendChatMessage(message: string): Promise<ChatResponse> {
     return response.json();
 }
 
-export async function postFeedback(promptNorm: string, thumb: Thumb) {
+export async function postFeedback(promptNorm: string, thumb: Thumb, generatedAt?: string) {
     const response = await fetch("http://localhost:8000/api/feedback/", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ prompt_norm: promptNorm, thumb }),
+        body: JSON.stringify({ prompt_norm: promptNorm, thumb, generated_at: generatedAt }),
     });
     if (!response.ok) {
         throw new Error("Eroare la trimiterea feedback-ului.");